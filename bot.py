@@ -4,55 +4,531 @@ DayMate Telegram Bot - Age, Days, and Time Calculator
 A button-only interface for date and time calculations
 """
 
+import asyncio
+import functools
+import itertools
 import logging
 import json
 import re
+import time
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional, Tuple
 from zoneinfo import ZoneInfo
-from dateutil.relativedelta import relativedelta
+from cachetools import TTLCache
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.error import BadRequest
+from telegram.ext import AIORateLimiter, Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.request import HTTPXRequest
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Optional: sessions stay in process memory without it
+    redis = None
+
+try:
+    import orjson
+except ImportError:  # Optional: faster session encoding for the shared cache
+    orjson = None
+
+# Import configuration
+from config import (
+    LOG_LEVEL, LOG_FORMAT, BOT_TOKEN, DEFAULT_TIMEZONE, CONNECTION_POOL_SIZE, POOL_TIMEOUT, HTTP_VERSION,
+    MAX_SESSION_SIZE, SESSION_TIMEOUT, REDIS_URL, SUPPORTED_TIMEZONES,
+    TIME_PRESETS_SECONDS, LABEL_BY_SECONDS,
+    POLL_TIMEOUT, POLL_INTERVAL, WEBHOOK_URL, WEBHOOK_SECRET, PORT,
+    get_timezone, validate_config
+)
 
 # Configure logging
 logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+    format=LOG_FORMAT,
+    level=getattr(logging, LOG_LEVEL.upper(), logging.INFO)
 )
 logger = logging.getLogger(__name__)
 
-# Import configuration
-from config import BOT_TOKEN, DEFAULT_TIMEZONE, get_timezone, validate_config
+# Flow callbacks look like "<flow>_<action>[_<args>]", e.g. "age_date_19920715"
+_CALLBACK_RE = re.compile(r"(?P<flow>age|days|time|settings)_(?P<action>[a-z0-9]+)(?:_(?P<args>.+))?")
+
+# Calendar navigation arguments: target month as YYYYMM (year 0001-9999), then an optional start date
+_NAV_ARGS_RE = re.compile(r"(?P<year>(?!0000)\d{4})(?P<month>0[1-9]|1[0-2])(?:_(?P<start>\d{8}))?", re.ASCII)
+
+# Callback data of buttons that do nothing (calendar labels and blanks)
+_NOOP_PATTERN = re.compile(r"^noop$")
+NOOP_CACHE_TIME = 3600  # Seconds clients may cache the answer to a no-op tap
+KEYPAD_DEBOUNCE = 0.15  # Seconds a keypad redraw waits for a following keystroke
+
+# In-memory session storage (ephemeral) keyed by (chat_id, message_id); a working copy
+# when Redis is used. Bounded LRU with expiry, so idle sessions don't pile up.
+sessions: TTLCache = TTLCache(maxsize=MAX_SESSION_SIZE, ttl=SESSION_TIMEOUT)
+
+# Session JSON codec: orjson when installed, otherwise the standard library
+_json_dumps = orjson.dumps if orjson is not None else json.dumps
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _encode_session(session: Dict[str, Any]):
+    """Serialize a session for the shared cache (timezone stored by name)"""
+    payload = {**session, 'timezone': session['timezone'].key}
+    # last_render hashes a str, and str hashes are salted per process
+    del payload['last_render']
+    return _json_dumps(payload)
+
+def _decode_session(raw) -> Dict[str, Any]:
+    """Inverse of _encode_session (with no screen known to be shown)"""
+    session = _json_loads(raw)
+    session['timezone'] = ZoneInfo(session['timezone'])
+    session['last_render'] = None
+    return session
+
+class _StaticMarkup(InlineKeyboardMarkup):
+    """Keyboard that is never changed, so its request payload is built once"""
+    
+    @functools.cached_property
+    def _payload(self):
+        return super().to_dict()
+    
+    def to_dict(self, recursive: bool = True):
+        # python-telegram-bot calls to_dict() on reply_markup for every request
+        return self._payload if recursive else super().to_dict(recursive)
+
+# Static keyboards are built once at import and shared by every chat
+_MAIN_MENU_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("🎂 Age Calculator", callback_data="age_calc"),
+        InlineKeyboardButton("📅 Days Calculator", callback_data="days_calc")
+    ],
+    [
+        InlineKeyboardButton("🕰 Time Calculator", callback_data="time_calc"),
+        InlineKeyboardButton("⚙️ Settings", callback_data="settings")
+    ],
+    [
+        InlineKeyboardButton("❓ Help", callback_data="help")
+    ]
+])
+
+_AGE_MENU_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("📅 Pick Date of Birth", callback_data="age_calendar"),
+        InlineKeyboardButton("🔢 Enter Year/Month/Day", callback_data="age_numeric")
+    ],
+    [
+        InlineKeyboardButton("📅 Today", callback_data="age_today"),
+        InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
+    ]
+])
+
+_DAYS_MENU_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("📅 Pick Start Date", callback_data="days_start"),
+        InlineKeyboardButton("📅 Pick End Date", callback_data="days_end")
+    ],
+    [
+        InlineKeyboardButton("📅 Today", callback_data="days_today"),
+        InlineKeyboardButton("📅 +7 Days", callback_data="days_plus7")
+    ],
+    [
+        InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
+    ]
+])
+
+_TIME_MENU_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("⏱️ Duration to H/M/S", callback_data="time_duration"),
+        InlineKeyboardButton("🔢 H/M/S to Seconds", callback_data="time_convert")
+    ],
+    [
+        InlineKeyboardButton("⚡ Quick Presets", callback_data="time_presets"),
+        InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
+    ]
+])
+
+# Timezones users may pick, loaded once so a settings tap does no tzdata I/O
+_TZ_WHITELIST: Dict[str, ZoneInfo] = {name: ZoneInfo(name) for name in SUPPORTED_TIMEZONES}
+
+_SETTINGS_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("🌏 Asia/Kolkata", callback_data="settings_tz_Asia/Kolkata"),
+        InlineKeyboardButton("🌍 UTC", callback_data="settings_tz_UTC")
+    ],
+    [
+        InlineKeyboardButton("🌎 America/New_York", callback_data="settings_tz_America/New_York"),
+        InlineKeyboardButton("🌏 Asia/Tokyo", callback_data="settings_tz_Asia/Tokyo")
+    ],
+    [
+        InlineKeyboardButton("🌍 Europe/London", callback_data="settings_tz_Europe/London"),
+        InlineKeyboardButton("🌎 America/Los_Angeles", callback_data="settings_tz_America/Los_Angeles")
+    ],
+    [
+        InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
+    ]
+])
+
+_HELP_MARKUP = _StaticMarkup([
+    [InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")]
+])
+
+# Time calculator screens
+_DURATION_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("1 hr", callback_data="time_dur_3600"),
+        InlineKeyboardButton("30 min", callback_data="time_dur_1800"),
+        InlineKeyboardButton("90 min", callback_data="time_dur_5400")
+    ],
+    [
+        InlineKeyboardButton("1 day", callback_data="time_dur_86400"),
+        InlineKeyboardButton("Custom", callback_data="time_dur_custom"),
+        InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
+    ]
+])
+
+# Quick presets come from config, three per row
+_PRESET_BUTTONS = [
+    InlineKeyboardButton(LABEL_BY_SECONDS[seconds], callback_data=f"time_preset_{seconds}")
+    for seconds in TIME_PRESETS_SECONDS
+]
+_PRESETS_MARKUP = _StaticMarkup([
+    *(_PRESET_BUTTONS[i:i + 3] for i in range(0, len(_PRESET_BUTTONS), 3)),
+    [
+        InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
+    ]
+])
 
-# In-memory session storage (ephemeral)
-sessions: Dict[str, Dict[str, Any]] = {}
+# Seconds the duration and preset buttons carry, as they appear in callback data
+_TIME_BUTTON_ARGS = {
+    "dur": frozenset(("3600", "1800", "5400", "86400")),
+    "preset": frozenset(map(str, TIME_PRESETS_SECONDS)),
+}
+
+_CUSTOM_UNIT_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("Hours", callback_data="time_custom_hours"),
+        InlineKeyboardButton("Minutes", callback_data="time_custom_minutes")
+    ],
+    [
+        InlineKeyboardButton("Seconds", callback_data="time_custom_seconds"),
+        InlineKeyboardButton("⬅️ Back", callback_data="time_duration")
+    ]
+])
+
+_CONVERT_MARKUP = _StaticMarkup([
+    [
+        InlineKeyboardButton("Hours", callback_data="time_convert_hours"),
+        InlineKeyboardButton("Minutes", callback_data="time_convert_minutes")
+    ],
+    [
+        InlineKeyboardButton("Seconds", callback_data="time_convert_seconds"),
+        InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
+    ]
+])
+
+# Result keyboards: static parts are shared, only swap/share buttons vary
+_MAIN_MENU_BUTTON = InlineKeyboardButton("⬅️ Main Menu", callback_data="back_to_menu")
+_MAIN_MENU_ROW = (_MAIN_MENU_BUTTON,)
+_AGE_RESULT_NAV_ROW = (
+    InlineKeyboardButton("🔁 New Age Calculation", callback_data="age_calc"),
+    _MAIN_MENU_BUTTON
+)
+_NEW_DAYS_CALC_BUTTON = InlineKeyboardButton("🔁 New Calculation", callback_data="days_calc")
+_TIME_RESULT_MARKUP = _StaticMarkup([
+    [InlineKeyboardButton("🔁 New Time Calculation", callback_data="time_calc"), _MAIN_MENU_BUTTON]
+])
+
+def _keypad_markup(num_prefix: str, confirm_data: str, back_data: str) -> InlineKeyboardMarkup:
+    """Build a 0-9 keypad with backspace, OK and Back buttons"""
+    return _StaticMarkup([
+        [InlineKeyboardButton(digit, callback_data=f"{num_prefix}_{digit}") for digit in "123"],
+        [InlineKeyboardButton(digit, callback_data=f"{num_prefix}_{digit}") for digit in "456"],
+        [InlineKeyboardButton(digit, callback_data=f"{num_prefix}_{digit}") for digit in "789"],
+        [
+            InlineKeyboardButton("0", callback_data=f"{num_prefix}_0"),
+            InlineKeyboardButton("⌫", callback_data=f"{num_prefix}_backspace"),
+            InlineKeyboardButton("OK", callback_data=confirm_data)
+        ],
+        [
+            InlineKeyboardButton("⬅️ Back", callback_data=back_data)
+        ]
+    ])
+
+# Date keypad, one per numeric-input flow
+_NUMERIC_MARKUPS = {
+    flow_type: _keypad_markup(f"{flow_type}_num", f"{flow_type}_confirm", f"{flow_type}_back")
+    for flow_type in ("age",)
+}
+
+# Keypad for custom durations in the time calculator
+_CUSTOM_TIME_MARKUP = _keypad_markup("time_custom_num", "time_custom_confirm", "time_dur_custom")
+
+def _parse_yyyymmdd(date_str: str) -> date:
+    """Parse a compact YYYYMMDD string (raises ValueError if invalid)"""
+    # int() alone would accept signs, spaces and short input like "2024011"
+    if len(date_str) != 8 or not date_str.isascii() or not date_str.isdigit():
+        raise ValueError(f"Expected YYYYMMDD, got {date_str!r}")
+    return date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
+
+def _format_yyyymmdd(value: date) -> str:
+    """Format a date as a compact YYYYMMDD string for callback data"""
+    return f"{value.year:04d}{value.month:02d}{value.day:02d}"
+
+# English month names indexed 1-12 (calendar.month_name re-runs strftime per lookup)
+_MONTH_NAMES = (
+    "", "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year: int, month: int) -> int:
+    """Number of days in a month, accounting for leap years"""
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+def _ymd_diff(end: date, start: date) -> Tuple[int, int, int]:
+    """Years, months and days from start to end (end >= start), as relativedelta counts them"""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    
+    # Whole months land on start's day, clamped to the length of the month
+    anchor_day = min(start.day, _days_in_month(end.year, end.month))
+    if end.day >= anchor_day:
+        days = end.day - anchor_day
+    else:
+        months -= 1
+        prev_year, prev_month = divmod(end.year * 12 + end.month - 2, 12)
+        prev_month += 1
+        prev_days = _days_in_month(prev_year, prev_month)
+        days = prev_days - min(start.day, prev_days) + end.day
+    
+    years, months = divmod(months, 12)
+    return years, months, days
+
+# Calendar cells that are the same for every month
+_WEEKDAY_HEADER_ROW = tuple(
+    InlineKeyboardButton(day, callback_data="noop")
+    for day in ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su")
+)
+_BLANK_DAY_BUTTON = InlineKeyboardButton(" ", callback_data="noop")
+
+def _calendar_markup(year: int, month: int, flow_type: str, suffix: str) -> InlineKeyboardMarkup:
+    """Calendar keyboard; only the suffix-free ones are cached
+    
+    A non-empty suffix is appended to every date, navigation and Today
+    callback so earlier choices travel with the button instead of the session.
+    Those carry a per-user start date, so they are built on demand.
+    """
+    if suffix:
+        return _build_calendar(year, month, flow_type, suffix)
+    return _month_calendar(year, month, flow_type)
+
+@functools.lru_cache(maxsize=512)
+def _month_calendar(year: int, month: int, flow_type: str) -> InlineKeyboardMarkup:
+    """Suffix-free calendar keyboard, cached per year, month and flow"""
+    return _build_calendar(year, month, flow_type, "")
+
+def _build_calendar(year: int, month: int, flow_type: str, suffix: str) -> InlineKeyboardMarkup:
+    """Build a calendar keyboard"""
+    tail = f"_{suffix}" if suffix else ""
+    
+    # Neighbouring months via a single month index (wraps years without branches)
+    month_index = year * 12 + (month - 1)
+    prev_year, prev_month = divmod(month_index - 1, 12)
+    next_year, next_month = divmod(month_index + 1, 12)
+    prev_month += 1
+    next_month += 1
+    
+    # Header with month navigation (buttons carry the target month as YYYYMM),
+    # blank at the ends of the date range
+    keyboard = [
+        [
+            InlineKeyboardButton("<<", callback_data=f"{flow_type}_nav_{prev_year:04d}{prev_month:02d}{tail}")
+            if prev_year >= date.min.year else _BLANK_DAY_BUTTON,
+            InlineKeyboardButton(f"{_MONTH_NAMES[month]} {year}", callback_data="noop"),
+            InlineKeyboardButton(">>", callback_data=f"{flow_type}_nav_{next_year:04d}{next_month:02d}{tail}")
+            if next_year <= date.max.year else _BLANK_DAY_BUTTON
+        ]
+    ]
+    
+    # Weekday headers
+    keyboard.append(_WEEKDAY_HEADER_ROW)
+    
+    # Days, Monday-first, padded with blanks to whole weeks
+    cells = [_BLANK_DAY_BUTTON] * date(year, month, 1).weekday()
+    for day in range(1, _days_in_month(year, month) + 1):
+        cells.append(InlineKeyboardButton(
+            str(day), 
+            callback_data=f"{flow_type}_date_{year:04d}{month:02d}{day:02d}{tail}"
+        ))
+    cells.extend([_BLANK_DAY_BUTTON] * (-len(cells) % 7))
+    for start in range(0, len(cells), 7):
+        keyboard.append(cells[start:start + 7])
+    
+    # Footer
+    keyboard.append([
+        InlineKeyboardButton("Today", callback_data=f"{flow_type}_today{tail}"),
+        InlineKeyboardButton("Back", callback_data="back_to_menu")
+    ])
+    
+    return _StaticMarkup(keyboard)
 
 class DayMateBot:
     def __init__(self):
         self.timezone = get_timezone()
         
+        # Optional shared session cache so several workers see the same state
+        self.bot_id = BOT_TOKEN.partition(":")[0]
+        self.cache = None
+        if REDIS_URL:
+            if redis is None:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-memory sessions")
+            else:
+                self.cache = redis.from_url(REDIS_URL)
+        
+        # Callback routing tables: exact callback_data (argument-free screens),
+        # then "<flow>_" prefix for actions that carry arguments or state
+        self._exact_dispatch = {
+            "age_calc": self.show_age_calculator,
+            "days_calc": self.show_days_calculator,
+            "time_calc": self.show_time_calculator,
+            "settings": self.show_settings,
+            "help": self.show_help,
+            "age_back": self.show_age_calculator,
+            "time_duration": self.show_duration_input,
+            "time_convert": self.show_time_convert_input,
+            "time_presets": self.show_time_presets,
+            "time_dur_custom": self.show_custom_duration_input,
+        }
+        self._prefix_dispatch = {
+            "age": self.handle_age_callback,
+            "days": self.handle_days_callback,
+            "time": self.handle_time_callback,
+            "settings": self.handle_settings_callback,
+        }
+        
+        # Today's date per timezone with the timestamp of its next local midnight
+        self._today_cache: Dict[ZoneInfo, Tuple[float, date]] = {}
+        
+        # Plain acknowledgements in flight, by callback query id
+        self._pending_acks: Dict[str, asyncio.Task] = {}
+        
+        # Latest debounced redraw per (chat_id, message_id), by ticket number
+        self._render_tickets = itertools.count()
+        self._pending_redraws: Dict[Tuple[int, int], int] = {}
+        
+        # Callbacks between load_session and save_session, per (chat_id, message_id)
+        self._session_users: Dict[Tuple[int, int], int] = {}
+        
+        # Latest unsent screen per (chat_id, message_id), and messages being edited
+        self._pending_edits: Dict[Tuple[int, int], Tuple[Any, str, InlineKeyboardMarkup]] = {}
+        self._editing = set()
+        
+    def _today(self, tz: ZoneInfo) -> date:
+        """Today's date in a timezone, recomputed only after local midnight"""
+        expires, today = self._today_cache.get(tz, (0.0, date.min))
+        if time.time() >= expires:
+            today = datetime.now(tz).date()
+            midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+            self._today_cache[tz] = (midnight.timestamp(), today)
+        return today
+
+    def _new_session(self) -> Dict[str, Any]:
+        """Fresh session state for a message"""
+        return {
+            'timezone': self.timezone,
+            'current_flow': None,
+            'last_render': None,
+            'version': 0,
+            'data': {}
+        }
+    
+    def _query_session(self, query) -> Dict[str, Any]:
+        """Session of the message a callback query came from"""
+        return self.get_session(query.message.chat_id, query.message.message_id)
+    
     def get_session(self, chat_id: int, message_id: int) -> Dict[str, Any]:
-        """Get or create session for user"""
-        key = f"{chat_id}_{message_id}"
-        if key not in sessions:
-            sessions[key] = {
-                'timezone': self.timezone,
-                'current_flow': None,
-                'data': {}
-            }
-        return sessions[key]
+        """Get or create session for user (no awaits, so atomic on the event loop)"""
+        key = (chat_id, message_id)
+        try:
+            return sessions[key]
+        except KeyError:
+            session = sessions[key] = self._new_session()
+            return session
     
     def update_session(self, chat_id: int, message_id: int, updates: Dict[str, Any]):
         """Update session data"""
         session = self.get_session(chat_id, message_id)
         session.update(updates)
     
-    def clear_session(self, chat_id: int, message_id: int):
+    async def clear_session(self, chat_id: int, message_id: int):
         """Clear session data"""
-        key = f"{chat_id}_{message_id}"
-        if key in sessions:
-            del sessions[key]
+        sessions.pop((chat_id, message_id), None)
+        if self.cache is not None:
+            try:
+                await self.cache.delete(self._cache_key(chat_id, message_id))
+            except redis.RedisError as e:
+                logger.warning(f"Session cache unavailable: {e}")
+    
+    def _cache_key(self, chat_id: int, message_id: int) -> str:
+        """Shared cache key, namespaced by bot so several bots can share Redis"""
+        return f"daymate:{self.bot_id}:{chat_id}:{message_id}"
+    
+    async def load_session(self, chat_id: int, message_id: int) -> Dict[str, Any]:
+        """Refresh the local session from the shared cache, if configured
+        
+        Every call is paired with a save_session for the same message. While
+        another callback is between the two, the local copy is kept: it holds
+        writes the cached copy has not seen yet.
+        """
+        key = (chat_id, message_id)
+        self._session_users[key] = self._session_users.get(key, 0) + 1
+        try:
+            raw = None
+            if self.cache is not None:
+                try:
+                    raw = await self.cache.get(self._cache_key(chat_id, message_id))
+                except redis.RedisError as e:
+                    # Fall back to the in-process copy
+                    logger.warning(f"Session cache unavailable: {e}")
+            
+            # Decode before touching the local copy, so a bad payload leaves it in place
+            cached = None
+            if raw is not None and self._session_users[key] == 1:
+                cached = _decode_session(raw)
+        except BaseException:
+            # No save_session follows a failed load, so release this callback here
+            self._release_session(key)
+            raise
+        
+        # No awaits from here on, so this read-modify-write is atomic on the event loop.
+        # Re-insert so an active session's expiry restarts on every callback
+        session = sessions.pop(key, None)
+        if session is None:
+            session = self._new_session()
+        # Only adopt state saved by another worker after this copy's last save
+        if cached is not None and cached.get('version', 0) > session['version']:
+            session.clear()
+            session.update(cached)
+        sessions[key] = session
+        return session
+    
+    def _release_session(self, key: Tuple[int, int]):
+        """Count one callback on a message as done with its session"""
+        users = self._session_users.pop(key, 1) - 1
+        if users:
+            self._session_users[key] = users
+    
+    async def save_session(self, chat_id: int, message_id: int, session: Dict[str, Any]):
+        """Write the local session back to the shared cache, if configured"""
+        self._release_session((chat_id, message_id))
+        if self.cache is None:
+            return
+        session['version'] += 1
+        try:
+            await self.cache.set(
+                self._cache_key(chat_id, message_id),
+                _encode_session(session),
+                ex=SESSION_TIMEOUT
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Session cache unavailable: {e}")
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -60,20 +536,7 @@ class DayMateBot:
     
     async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show main menu with all calculator options"""
-        keyboard = [
-            [
-                InlineKeyboardButton("🎂 Age Calculator", callback_data="age_calc"),
-                InlineKeyboardButton("📅 Days Calculator", callback_data="days_calc")
-            ],
-            [
-                InlineKeyboardButton("🕰 Time Calculator", callback_data="time_calc"),
-                InlineKeyboardButton("⚙️ Settings", callback_data="settings")
-            ],
-            [
-                InlineKeyboardButton("❓ Help", callback_data="help")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _MAIN_MENU_MARKUP
         
         welcome_text = (
             "🎉 Welcome to DayMate! 📅\n\n"
@@ -87,10 +550,7 @@ class DayMateBot:
         )
         
         if update.callback_query:
-            await update.callback_query.edit_message_text(
-                text=welcome_text,
-                reply_markup=reply_markup
-            )
+            await self._render(update.callback_query, welcome_text, reply_markup)
         else:
             await update.message.reply_text(
                 text=welcome_text,
@@ -100,49 +560,127 @@ class DayMateBot:
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle all callback queries"""
         query = update.callback_query
-        await query.answer()
-        
         data = query.data
         chat_id = query.message.chat_id
         message_id = query.message.message_id
         
         # Update session
-        self.update_session(chat_id, message_id, {'current_flow': data})
-        
-        if data == "age_calc":
-            await self.show_age_calculator(query, context)
-        elif data == "days_calc":
-            await self.show_days_calculator(query, context)
-        elif data == "time_calc":
-            await self.show_time_calculator(query, context)
-        elif data == "settings":
-            await self.show_settings(query, context)
-        elif data == "help":
-            await self.show_help(query, context)
-        elif data == "back_to_menu":
-            await self.show_main_menu(update, context)
-        elif data.startswith("age_"):
-            await self.handle_age_callback(query, context)
-        elif data.startswith("days_"):
-            await self.handle_days_callback(query, context)
-        elif data.startswith("time_"):
-            await self.handle_time_callback(query, context)
-        elif data.startswith("settings_"):
-            await self.handle_settings_callback(query, context)
+        session = await self.load_session(chat_id, message_id)
+        session['current_flow'] = data
+        
+        # Acknowledge up front so the client spinner stops while the edit is in flight
+        self._pending_acks[query.id] = asyncio.create_task(self._acknowledge(query))
+        
+        try:
+            if data == "back_to_menu":
+                await self.show_main_menu(update, context)
+                return
+            
+            # Exact screens first, then "<flow>_<action>[_<args>]" parsed in one pass
+            handler = self._exact_dispatch.get(data)
+            if handler is not None:
+                await handler(query, context)
+                return
+            match = _CALLBACK_RE.fullmatch(data)
+            if match is not None:
+                flow, action, args = match.group('flow', 'action', 'args')
+                await self._prefix_dispatch[flow](query, context, session, action, args or "")
+        finally:
+            ack = self._pending_acks.pop(query.id, None)
+            if ack is not None:
+                await ack
+            await self.save_session(chat_id, message_id, session)
+
+    async def _acknowledge(self, query):
+        """Send the plain acknowledgement for a callback query"""
+        # Yield first: under an eager task factory the task would otherwise send
+        # before the handler could claim the answer for a notice or alert
+        await asyncio.sleep(0)
+        await query.answer()
+
+    def _claim_answer(self, query) -> bool:
+        """Cancel the pending plain acknowledgement; False if it already went out"""
+        ack = self._pending_acks.pop(query.id, None)
+        if ack is None or ack.cancel():
+            return True
+        # A query is answered only once, so a later notice cannot be shown
+        logger.debug(f"Callback {query.id} already acknowledged")
+        return False
+
+    async def _answer(self, query, text: Optional[str] = None, show_alert: bool = False):
+        """Answer with a notice or alert in place of the plain acknowledgement"""
+        if self._claim_answer(query):
+            await query.answer(text, show_alert=show_alert)
+
+    async def _render(self, query, text: str, reply_markup: InlineKeyboardMarkup, notice: Optional[str] = None,
+                      debounce: bool = False):
+        """Edit the callback's message, sending any toast notice alongside
+        
+        Every callback is answered exactly once: by the acknowledgement
+        handle_callback_query fires up front, or by a notice or alert that
+        claims the answer before that acknowledgement gets to run.
+        
+        With debounce, the edit waits KEYPAD_DEBOUNCE seconds and is dropped
+        if another render for the message starts meanwhile, so fast typing
+        costs one edit for the final input.
+        """
+        key = (query.message.chat_id, query.message.message_id)
+        if debounce:
+            ticket = self._pending_redraws[key] = next(self._render_tickets)
+            await asyncio.sleep(KEYPAD_DEBOUNCE)
+            if self._pending_redraws.get(key) != ticket:
+                return
+        # Any render supersedes a redraw still waiting out its debounce
+        self._pending_redraws.pop(key, None)
+        
+        # Skip the edit round trip if this message already shows the same screen
+        session = self._query_session(query)
+        signature = hash((text, reply_markup))
+        if session['last_render'] == signature:
+            if notice and self._claim_answer(query):
+                await query.answer(notice)
+            return
+        session['last_render'] = signature
+        
+        # Claim before awaiting anything, or the queued acknowledgement wins
+        if notice and self._claim_answer(query):
+            await asyncio.gather(query.answer(notice), self._edit(query, text, reply_markup))
+        else:
+            await self._edit(query, text, reply_markup)
+
+    async def _edit(self, query, text: str, reply_markup: InlineKeyboardMarkup):
+        """Edit a message, coalescing screens queued while an edit is in flight
+        
+        The first caller for a message sends edits until none are pending;
+        later callers just replace the pending screen, so a burst of taps
+        costs one edit for the screen in flight plus one for the latest.
+        """
+        key = (query.message.chat_id, query.message.message_id)
+        self._pending_edits[key] = (query, text, reply_markup)
+        if key in self._editing:
+            return
+        
+        self._editing.add(key)
+        try:
+            while key in self._pending_edits:
+                query, text, reply_markup = self._pending_edits.pop(key)
+                try:
+                    await query.edit_message_text(text=text, reply_markup=reply_markup)
+                except BadRequest as e:
+                    # Re-rendering an identical screen is harmless
+                    if "message is not modified" not in str(e):
+                        raise
+        except BaseException:
+            # The screen may never have been shown, so an identical render must not be skipped
+            self._query_session(query)['last_render'] = None
+            raise
+        finally:
+            self._editing.discard(key)
+            self._pending_edits.pop(key, None)
 
     async def show_age_calculator(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show age calculator interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("📅 Pick Date of Birth", callback_data="age_calendar"),
-                InlineKeyboardButton("🔢 Enter Year/Month/Day", callback_data="age_numeric")
-            ],
-            [
-                InlineKeyboardButton("📅 Today", callback_data="age_today"),
-                InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _AGE_MENU_MARKUP
         
         text = (
             "🎂 Age Calculator\n\n"
@@ -152,27 +690,11 @@ class DayMateBot:
             "• 📅 Use today's date"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
     async def show_days_calculator(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show days calculator interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("📅 Pick Start Date", callback_data="days_start"),
-                InlineKeyboardButton("📅 Pick End Date", callback_data="days_end")
-            ],
-            [
-                InlineKeyboardButton("📅 Today", callback_data="days_today"),
-                InlineKeyboardButton("📅 +7 Days", callback_data="days_plus7")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _DAYS_MENU_MARKUP
         
         text = (
             "📅 Days Calculator\n\n"
@@ -182,24 +704,11 @@ class DayMateBot:
             "• 📅 Quick presets available"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
     async def show_time_calculator(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show time calculator interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("⏱️ Duration to H/M/S", callback_data="time_duration"),
-                InlineKeyboardButton("🔢 H/M/S to Seconds", callback_data="time_convert")
-            ],
-            [
-                InlineKeyboardButton("⚡ Quick Presets", callback_data="time_presets"),
-                InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _TIME_MENU_MARKUP
         
         text = (
             "🕰 Time Calculator\n\n"
@@ -209,50 +718,24 @@ class DayMateBot:
             "• ⚡ Use quick presets for common durations"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def show_settings(self, query, context: ContextTypes.DEFAULT_TYPE):
+    async def show_settings(self, query, context: ContextTypes.DEFAULT_TYPE, notice: Optional[str] = None):
         """Show settings interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("🌏 Asia/Kolkata", callback_data="settings_tz_Asia/Kolkata"),
-                InlineKeyboardButton("🌍 UTC", callback_data="settings_tz_UTC")
-            ],
-            [
-                InlineKeyboardButton("🌎 America/New_York", callback_data="settings_tz_America/New_York"),
-                InlineKeyboardButton("🌏 Asia/Tokyo", callback_data="settings_tz_Asia/Tokyo")
-            ],
-            [
-                InlineKeyboardButton("🌍 Europe/London", callback_data="settings_tz_Europe/London"),
-                InlineKeyboardButton("🌎 America/Los_Angeles", callback_data="settings_tz_America/Los_Angeles")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _SETTINGS_MARKUP
         
         text = (
             "⚙️ Settings\n\n"
             "Choose your timezone:\n\n"
-            "Current timezone: Asia/Kolkata\n"
-            "Note: Settings are temporary and reset when bot restarts."
+            f"Current timezone: {self._query_session(query)['timezone']}\n"
+            "Note: Settings apply to this menu only and reset when it expires."
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup, notice)
 
     async def show_help(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show help information"""
-        keyboard = [
-            [InlineKeyboardButton("⬅️ Back to Menu", callback_data="back_to_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _HELP_MARKUP
         
         text = (
             "❓ Help & Examples\n\n"
@@ -270,207 +753,114 @@ class DayMateBot:
             "• Use quick presets for common durations\n\n"
             "⚙️ Settings:\n"
             "• Change timezone for calculations\n"
-            "• Settings are temporary (reset on restart)\n\n"
+            "• Settings apply to this menu only and reset when it expires\n\n"
             "All interactions are button-based - no typing required! 🎯"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def handle_age_callback(self, query, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_age_callback(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                  action: str, args: str):
         """Handle age calculator callbacks"""
-        data = query.data
-        chat_id = query.message.chat_id
-        message_id = query.message.message_id
-        session = self.get_session(chat_id, message_id)
-        
-        if data == "age_calendar":
-            await self.show_calendar(query, context, "age")
-        elif data == "age_numeric":
+        if action == "calendar":
+            await self.show_calendar(query, context, session, "age")
+        elif action == "numeric":
             session['data']['numeric_input'] = ""
             await self.show_numeric_input(query, context, "age")
-        elif data == "age_today":
-            await self.calculate_age(query, context, date.today())
-        elif data.startswith("age_date_"):
-            # Extract date from callback data
-            date_str = data.replace("age_date_", "")
+        elif action == "today":
+            await self.calculate_age(query, context, session, self._today(session['timezone']))
+        elif action == "date":
             try:
-                dob = datetime.strptime(date_str, "%Y%m%d").date()
-                await self.calculate_age(query, context, dob)
+                dob = _parse_yyyymmdd(args)
             except ValueError:
-                await query.answer("Invalid date format", show_alert=True)
-        elif data.startswith("age_prev_") or data.startswith("age_next_"):
-            # Handle calendar navigation
-            parts = data.split("_")
-            year = int(parts[2])
-            month = int(parts[3])
-            
-            if "prev" in data:
-                month -= 1
-                if month < 1:
-                    month = 12
-                    year -= 1
-            else:
-                month += 1
-                if month > 12:
-                    month = 1
-                    year += 1
-            
-            keyboard = self.build_calendar_keyboard(year, month, "age")
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            import calendar
-            month_name = calendar.month_name[month]
-            text = f"📅 Select Date of Birth\n\n{month_name} {year}"
-            
-            await query.edit_message_text(
-                text=text,
-                reply_markup=reply_markup
-            )
-        elif data.startswith("age_num_"):
+                await self._answer(query, "Invalid date format", show_alert=True)
+                return
+            await self.calculate_age(query, context, session, dob)
+        elif action == "nav":
+            # Handle calendar navigation (target month as YYYYMM)
+            nav = _NAV_ARGS_RE.fullmatch(args)
+            if nav is not None:
+                await self.show_calendar(query, context, session, "age", int(nav['year']), int(nav['month']))
+        elif action == "num":
             # Handle numeric input
-            digit = data.split("_")[2]
             current_input = session['data'].get('numeric_input', "")
             
-            if digit == "backspace":
+            if args == "backspace":
                 current_input = current_input[:-1]
             else:
-                current_input += digit
+                current_input += args
             
             session['data']['numeric_input'] = current_input
             await self.update_numeric_display(query, context, "age", current_input)
-        elif data == "age_confirm":
+        elif action == "confirm":
             # Confirm numeric input
             current_input = session['data'].get('numeric_input', "")
             if len(current_input) == 8:  # YYYYMMDD format
                 try:
-                    dob = datetime.strptime(current_input, "%Y%m%d").date()
-                    await self.calculate_age(query, context, dob)
+                    dob = _parse_yyyymmdd(current_input)
                 except ValueError:
-                    await query.answer("Invalid date format", show_alert=True)
+                    await self._answer(query, "Invalid date format", show_alert=True)
+                    return
+                await self.calculate_age(query, context, session, dob)
             else:
-                await query.answer("Please enter date in YYYYMMDD format", show_alert=True)
-        elif data == "age_back":
-            await self.show_age_calculator(query, context)
+                await self._answer(query, "Please enter date in YYYYMMDD format", show_alert=True)
 
-    async def handle_days_callback(self, query, context: ContextTypes.DEFAULT_TYPE):
-        """Handle days calculator callbacks"""
-        data = query.data
-        chat_id = query.message.chat_id
-        message_id = query.message.message_id
-        session = self.get_session(chat_id, message_id)
-        
-        if data == "days_start":
-            session['data']['selecting'] = 'start'
-            await self.show_calendar(query, context, "days")
-        elif data == "days_end":
-            session['data']['selecting'] = 'end'
-            await self.show_calendar(query, context, "days")
-        elif data == "days_today":
-            if session['data'].get('selecting') == 'start':
-                session['data']['start_date'] = date.today()
-                session['data']['selecting'] = 'end'
-                await self.show_calendar(query, context, "days")
-            else:
-                session['data']['end_date'] = date.today()
-                await self.calculate_days_difference(query, context)
-        elif data == "days_plus7":
-            if session['data'].get('selecting') == 'start':
-                session['data']['start_date'] = date.today()
-                session['data']['selecting'] = 'end'
-                await self.show_calendar(query, context, "days")
-            else:
-                session['data']['end_date'] = date.today() + timedelta(days=7)
-                await self.calculate_days_difference(query, context)
-        elif data.startswith("days_date_"):
-            date_str = data.replace("days_date_", "")
-            try:
-                selected_date = datetime.strptime(date_str, "%Y%m%d").date()
-                if session['data'].get('selecting') == 'start':
-                    session['data']['start_date'] = selected_date
-                    session['data']['selecting'] = 'end'
-                    await self.show_calendar(query, context, "days")
+    async def handle_days_callback(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                   action: str, args: str):
+        """Handle days calculator callbacks
+        
+        The flow is stateless: once a start date is picked, every button on
+        the end-date calendar carries it as a trailing "_YYYYMMDD".
+        """
+        try:
+            if action == "start":
+                await self.show_calendar(query, context, session, "days")
+            elif action == "end":
+                # Picking the end date first measures from today
+                await self.show_calendar(query, context, session, "days", suffix=_format_yyyymmdd(self._today(session['timezone'])))
+            elif action == "today":
+                if args:
+                    await self.calculate_days_difference(query, context, _parse_yyyymmdd(args), self._today(session['timezone']))
                 else:
-                    session['data']['end_date'] = selected_date
-                    await self.calculate_days_difference(query, context)
-            except ValueError:
-                await query.answer("Invalid date format", show_alert=True)
-        elif data.startswith("days_prev_") or data.startswith("days_next_"):
-            # Handle calendar navigation
-            parts = data.split("_")
-            year = int(parts[2])
-            month = int(parts[3])
-            
-            if "prev" in data:
-                month -= 1
-                if month < 1:
-                    month = 12
-                    year -= 1
-            else:
-                month += 1
-                if month > 12:
-                    month = 1
-                    year += 1
-            
-            keyboard = self.build_calendar_keyboard(year, month, "days")
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            import calendar
-            month_name = calendar.month_name[month]
-            selecting = session['data'].get('selecting', 'start')
-            text = f"📅 Select {'Start' if selecting == 'start' else 'End'} Date\n\n{month_name} {year}"
-            
-            await query.edit_message_text(
-                text=text,
-                reply_markup=reply_markup
-            )
-        elif data == "days_swap":
-            # Swap start and end dates
-            start = session['data'].get('start_date')
-            end = session['data'].get('end_date')
-            if start and end:
-                session['data']['start_date'] = end
-                session['data']['end_date'] = start
-                await self.calculate_days_difference(query, context)
-
-    async def handle_time_callback(self, query, context: ContextTypes.DEFAULT_TYPE):
+                    await self.show_calendar(query, context, session, "days", suffix=_format_yyyymmdd(self._today(session['timezone'])))
+            elif action == "plus7":
+                today = self._today(session['timezone'])
+                await self.calculate_days_difference(query, context, today, today + timedelta(days=7))
+            elif action == "date":
+                selected_str, _, start_str = args.partition("_")
+                selected_date = _parse_yyyymmdd(selected_str)
+                if start_str:
+                    await self.calculate_days_difference(query, context, _parse_yyyymmdd(start_str), selected_date)
+                else:
+                    await self.show_calendar(query, context, session, "days", suffix=selected_str)
+            elif action == "nav":
+                # Handle calendar navigation (target month as YYYYMM, then any start date)
+                nav = _NAV_ARGS_RE.fullmatch(args)
+                if nav is not None:
+                    await self.show_calendar(query, context, session, "days", int(nav['year']), int(nav['month']),
+                                             nav['start'] or "")
+            elif action == "swap":
+                # Swap start and end dates
+                start_str, _, end_str = args.partition("_")
+                await self.calculate_days_difference(query, context, _parse_yyyymmdd(end_str), _parse_yyyymmdd(start_str))
+        except ValueError:
+            await self._answer(query, "Invalid date format", show_alert=True)
+
+    async def handle_time_callback(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                   action: str, args: str):
         """Handle time calculator callbacks"""
-        data = query.data
-        
-        if data == "time_duration":
-            await self.show_duration_input(query, context)
-        elif data == "time_convert":
-            await self.show_time_convert_input(query, context)
-        elif data == "time_presets":
-            await self.show_time_presets(query, context)
-        elif data.startswith("time_dur_"):
-            # Handle duration calculations
-            if data == "time_dur_custom":
-                await self.show_custom_duration_input(query, context)
-            else:
-                seconds = int(data.split("_")[2])
-                await self.handle_time_duration_callback(query, context, seconds)
-        elif data.startswith("time_preset_"):
-            # Handle time presets
-            seconds = int(data.split("_")[2])
-            await self.handle_time_duration_callback(query, context, seconds)
-        elif data.startswith("time_custom_"):
+        if action in _TIME_BUTTON_ARGS:
+            # Handle duration calculations and presets (only values the buttons offer)
+            if args in _TIME_BUTTON_ARGS[action]:
+                await self.handle_time_duration_callback(query, context, int(args))
+        elif action == "custom":
             # Handle custom time input
-            if data == "time_custom_hours":
-                await self.show_custom_time_input(query, context, "hours")
-            elif data == "time_custom_minutes":
-                await self.show_custom_time_input(query, context, "minutes")
-            elif data == "time_custom_seconds":
-                await self.show_custom_time_input(query, context, "seconds")
-            elif data.startswith("time_custom_num_"):
+            step, _, digit = args.partition("_")
+            
+            if step in ("hours", "minutes", "seconds"):
+                await self.show_custom_time_input(query, context, session, step)
+            elif step == "num":
                 # Handle numeric input for custom time
-                chat_id = query.message.chat_id
-                message_id = query.message.message_id
-                session = self.get_session(chat_id, message_id)
-                
-                digit = data.split("_")[3]
                 current_input = session['data'].get('custom_time_input', "")
                 
                 if digit == "backspace":
@@ -479,133 +869,62 @@ class DayMateBot:
                     current_input += digit
                 
                 session['data']['custom_time_input'] = current_input
-                await self.update_custom_time_display(query, context, current_input)
-            elif data == "time_custom_confirm":
+                await self.update_custom_time_display(query, context, session, current_input)
+            elif step == "confirm":
                 # Confirm custom time input
-                chat_id = query.message.chat_id
-                message_id = query.message.message_id
-                session = self.get_session(chat_id, message_id)
-                
                 current_input = session['data'].get('custom_time_input', "")
                 time_type = session['data'].get('custom_time_type', 'seconds')
                 
                 try:
                     value = int(current_input)
-                    if time_type == "hours":
-                        total_seconds = value * 3600
-                    elif time_type == "minutes":
-                        total_seconds = value * 60
-                    else:
-                        total_seconds = value
-                    
-                    await self.handle_time_duration_callback(query, context, total_seconds)
                 except ValueError:
-                    await query.answer("Please enter a valid number", show_alert=True)
+                    await self._answer(query, "Please enter a valid number", show_alert=True)
+                    return
+                
+                if time_type == "hours":
+                    total_seconds = value * 3600
+                elif time_type == "minutes":
+                    total_seconds = value * 60
+                else:
+                    total_seconds = value
+                
+                await self.handle_time_duration_callback(query, context, total_seconds)
 
-    async def handle_settings_callback(self, query, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_settings_callback(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                       action: str, args: str):
         """Handle settings callbacks"""
-        data = query.data
-        
-        if data.startswith("settings_tz_"):
-            timezone_str = data.replace("settings_tz_", "")
-            try:
-                self.timezone = ZoneInfo(timezone_str)
-                await query.answer(f"Timezone changed to {timezone_str}")
-                await self.show_settings(query, context)
-            except Exception as e:
-                await query.answer(f"Invalid timezone: {timezone_str}", show_alert=True)
-
-    async def show_calendar(self, query, context: ContextTypes.DEFAULT_TYPE, flow_type: str):
-        """Show calendar widget"""
-        now = datetime.now(self.timezone)
-        year = now.year
-        month = now.month
-        
-        keyboard = self.build_calendar_keyboard(year, month, flow_type)
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        month_name = now.strftime("%B %Y")
-        text = f"📅 Select Date\n\n{month_name}"
-        
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        if action == "tz":
+            timezone_str = args
+            tz = _TZ_WHITELIST.get(timezone_str)
+            if tz is None:
+                await self._answer(query, f"Invalid timezone: {timezone_str}", show_alert=True)
+                return
+            # Per message, so one chat's choice never leaks into another's results
+            session['timezone'] = tz
+            await self.show_settings(query, context, notice=f"Timezone changed to {timezone_str}")
 
-    def build_calendar_keyboard(self, year: int, month: int, flow_type: str) -> list:
-        """Build calendar keyboard"""
-        import calendar
-        
-        # Header with month navigation
-        keyboard = [
-            [
-                InlineKeyboardButton("<<", callback_data=f"{flow_type}_prev_{year}_{month}"),
-                InlineKeyboardButton(f"{calendar.month_name[month]} {year}", callback_data="noop"),
-                InlineKeyboardButton(">>", callback_data=f"{flow_type}_next_{year}_{month}")
-            ]
-        ]
-        
-        # Weekday headers
-        keyboard.append([
-            InlineKeyboardButton("Mo", callback_data="noop"),
-            InlineKeyboardButton("Tu", callback_data="noop"),
-            InlineKeyboardButton("We", callback_data="noop"),
-            InlineKeyboardButton("Th", callback_data="noop"),
-            InlineKeyboardButton("Fr", callback_data="noop"),
-            InlineKeyboardButton("Sa", callback_data="noop"),
-            InlineKeyboardButton("Su", callback_data="noop")
-        ])
-        
-        # Days
-        cal = calendar.monthcalendar(year, month)
-        for week in cal:
-            row = []
-            for day in week:
-                if day == 0:
-                    row.append(InlineKeyboardButton(" ", callback_data="noop"))
-                else:
-                    row.append(InlineKeyboardButton(
-                        str(day), 
-                        callback_data=f"{flow_type}_date_{year:04d}{month:02d}{day:02d}"
-                    ))
-            keyboard.append(row)
-        
-        # Footer
-        keyboard.append([
-            InlineKeyboardButton("Today", callback_data=f"{flow_type}_today"),
-            InlineKeyboardButton("Back", callback_data="back_to_menu")
-        ])
+    async def show_calendar(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any], flow_type: str,
+                            year: Optional[int] = None, month: Optional[int] = None, suffix: str = ""):
+        """Show calendar widget (defaults to the current month)"""
+        if year is None or month is None:
+            today = self._today(session['timezone'])
+            year = today.year
+            month = today.month
+        
+        reply_markup = _calendar_markup(year, month, flow_type, suffix)
+        
+        if flow_type == "days":
+            # The end-date calendar carries the chosen start date
+            title = "Select End Date" if suffix else "Select Start Date"
+        else:
+            title = "Select Date of Birth"
+        text = f"📅 {title}\n\n{_MONTH_NAMES[month]} {year}"
         
-        return keyboard
+        await self._render(query, text, reply_markup)
 
     async def show_numeric_input(self, query, context: ContextTypes.DEFAULT_TYPE, flow_type: str):
         """Show numeric input interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("1", callback_data=f"{flow_type}_num_1"),
-                InlineKeyboardButton("2", callback_data=f"{flow_type}_num_2"),
-                InlineKeyboardButton("3", callback_data=f"{flow_type}_num_3")
-            ],
-            [
-                InlineKeyboardButton("4", callback_data=f"{flow_type}_num_4"),
-                InlineKeyboardButton("5", callback_data=f"{flow_type}_num_5"),
-                InlineKeyboardButton("6", callback_data=f"{flow_type}_num_6")
-            ],
-            [
-                InlineKeyboardButton("7", callback_data=f"{flow_type}_num_7"),
-                InlineKeyboardButton("8", callback_data=f"{flow_type}_num_8"),
-                InlineKeyboardButton("9", callback_data=f"{flow_type}_num_9")
-            ],
-            [
-                InlineKeyboardButton("0", callback_data=f"{flow_type}_num_0"),
-                InlineKeyboardButton("⌫", callback_data=f"{flow_type}_backspace"),
-                InlineKeyboardButton("OK", callback_data=f"{flow_type}_confirm")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back", callback_data=f"{flow_type}_back")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _NUMERIC_MARKUPS[flow_type]
         
         text = (
             f"🔢 Enter Date\n\n"
@@ -614,21 +933,19 @@ class DayMateBot:
             f"Example: 1992-07-15"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def calculate_age(self, query, context: ContextTypes.DEFAULT_TYPE, dob: date):
+    async def calculate_age(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any], dob: date):
         """Calculate and display age"""
-        now = datetime.now(self.timezone).date()
+        tz = session['timezone']
+        now = self._today(tz)
         
         if dob > now:
-            await query.answer("Date of birth cannot be in the future!", show_alert=True)
+            await self._answer(query, "Date of birth cannot be in the future!", show_alert=True)
             return
         
-        # Calculate age using relativedelta for accuracy
-        age = relativedelta(now, dob)
+        # Calendar years, months and days lived
+        years, months, days = _ymd_diff(now, dob)
         
         # Calculate total days
         total_days = (now - dob).days
@@ -636,43 +953,26 @@ class DayMateBot:
         total_hours = total_days * 24
         
         # Format result
+        dob_iso = dob.isoformat()
         result_text = (
-            f"🎂 Age Result for {dob.strftime('%Y-%m-%d')}\n"
-            f"(Reference: {now.strftime('%Y-%m-%d')}, {self.timezone})\n\n"
-            f"• {age.years} years, {age.months} months, {age.days} days\n"
+            f"🎂 Age Result for {dob_iso}\n"
+            f"(Reference: {now.isoformat()}, {tz})\n\n"
+            f"• {years} years, {months} months, {days} days\n"
             f"• Weeks lived: {total_weeks:.0f} weeks (approx)\n"
             f"• Total days: {total_days:,} days\n"
             f"• Total hours: {total_hours:,} hours"
         )
         
-        keyboard = [
-            [
-                InlineKeyboardButton("🔁 New Age Calculation", callback_data="age_calc"),
-                InlineKeyboardButton("⬅️ Main Menu", callback_data="back_to_menu")
-            ],
-            [
-                InlineKeyboardButton("📌 Share", callback_data=f"share_age_{dob}")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = InlineKeyboardMarkup((
+            _AGE_RESULT_NAV_ROW,
+            (InlineKeyboardButton("📌 Share", callback_data=f"share_age_{dob_iso}"),)
+        ))
         
-        await query.edit_message_text(
-            text=result_text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, result_text, reply_markup)
 
-    async def calculate_days_difference(self, query, context: ContextTypes.DEFAULT_TYPE):
+    async def calculate_days_difference(self, query, context: ContextTypes.DEFAULT_TYPE, start_date: date, end_date: date):
         """Calculate days difference between two dates"""
-        chat_id = query.message.chat_id
-        message_id = query.message.message_id
-        session = self.get_session(chat_id, message_id)
-        
-        start_date = session['data'].get('start_date')
-        end_date = session['data'].get('end_date')
-        
-        if not start_date or not end_date:
-            await query.answer("Please select both start and end dates", show_alert=True)
-            return
+        swap_data = f"days_swap_{_format_yyyymmdd(start_date)}_{_format_yyyymmdd(end_date)}"
         
         # Calculate difference
         if end_date < start_date:
@@ -682,105 +982,66 @@ class DayMateBot:
         else:
             swapped = False
         
-        diff = relativedelta(end_date, start_date)
+        years, months, days = _ymd_diff(end_date, start_date)
         total_days = (end_date - start_date).days
         total_weeks = total_days / 7
         
         # Format result
         if swapped:
             result_text = (
-                f"📅 From {end_date.strftime('%Y-%m-%d')} to {start_date.strftime('%Y-%m-%d')}\n\n"
-                f"• {diff.years} years, {diff.months} months, {diff.days} days\n"
+                f"📅 From {end_date.isoformat()} to {start_date.isoformat()}\n\n"
+                f"• {years} years, {months} months, {days} days\n"
                 f"• Total days: {total_days:,}\n"
                 f"• Total weeks: {total_weeks:.1f}\n\n"
                 f"Note: Dates were swapped (end < start)"
             )
         else:
             result_text = (
-                f"📅 From {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n\n"
-                f"• {diff.years} years, {diff.months} months, {diff.days} days\n"
+                f"📅 From {start_date.isoformat()} to {end_date.isoformat()}\n\n"
+                f"• {years} years, {months} months, {days} days\n"
                 f"• Total days: {total_days:,}\n"
                 f"• Total weeks: {total_weeks:.1f}"
             )
         
-        keyboard = [
-            [
-                InlineKeyboardButton("🔄 Swap Dates", callback_data="days_swap"),
-                InlineKeyboardButton("🔁 New Calculation", callback_data="days_calc")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Main Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = InlineKeyboardMarkup((
+            (InlineKeyboardButton("🔄 Swap Dates", callback_data=swap_data), _NEW_DAYS_CALC_BUTTON),
+            _MAIN_MENU_ROW
+        ))
         
-        await query.edit_message_text(
-            text=result_text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, result_text, reply_markup)
 
     async def show_duration_input(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show duration input interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("1 hr", callback_data="time_dur_3600"),
-                InlineKeyboardButton("30 min", callback_data="time_dur_1800"),
-                InlineKeyboardButton("90 min", callback_data="time_dur_5400")
-            ],
-            [
-                InlineKeyboardButton("1 day", callback_data="time_dur_86400"),
-                InlineKeyboardButton("Custom", callback_data="time_dur_custom"),
-                InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _DURATION_MARKUP
         
         text = (
             "⏱️ Duration to Hours/Minutes/Seconds\n\n"
             "Select a duration or choose custom input:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
     async def show_time_presets(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show time presets"""
-        keyboard = [
-            [
-                InlineKeyboardButton("1 min", callback_data="time_preset_60"),
-                InlineKeyboardButton("5 min", callback_data="time_preset_300"),
-                InlineKeyboardButton("15 min", callback_data="time_preset_900")
-            ],
-            [
-                InlineKeyboardButton("1 hour", callback_data="time_preset_3600"),
-                InlineKeyboardButton("2 hours", callback_data="time_preset_7200"),
-                InlineKeyboardButton("1 day", callback_data="time_preset_86400")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _PRESETS_MARKUP
         
         text = (
             "⚡ Quick Time Presets\n\n"
             "Select a common duration:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
     def format_duration(self, total_seconds: int) -> str:
         """Format duration in seconds to H/M/S"""
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
         
-        return f"{hours} hours, {minutes} minutes, {seconds} seconds"
+        return (
+            f"{hours} hour{'s' if hours != 1 else ''}, "
+            f"{minutes} minute{'s' if minutes != 1 else ''}, "
+            f"{seconds} second{'s' if seconds != 1 else ''}"
+        )
 
     async def handle_time_duration_callback(self, query, context: ContextTypes.DEFAULT_TYPE, seconds: int):
         """Handle time duration calculation"""
@@ -792,58 +1053,17 @@ class DayMateBot:
             f"• Total seconds: {seconds:,}"
         )
         
-        keyboard = [
-            [
-                InlineKeyboardButton("🔁 New Time Calculation", callback_data="time_calc"),
-                InlineKeyboardButton("⬅️ Main Menu", callback_data="back_to_menu")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _TIME_RESULT_MARKUP
         
-        await query.edit_message_text(
-            text=result_text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, result_text, reply_markup)
 
     async def update_numeric_display(self, query, context: ContextTypes.DEFAULT_TYPE, flow_type: str, current_input: str):
         """Update numeric input display"""
-        keyboard = [
-            [
-                InlineKeyboardButton("1", callback_data=f"{flow_type}_num_1"),
-                InlineKeyboardButton("2", callback_data=f"{flow_type}_num_2"),
-                InlineKeyboardButton("3", callback_data=f"{flow_type}_num_3")
-            ],
-            [
-                InlineKeyboardButton("4", callback_data=f"{flow_type}_num_4"),
-                InlineKeyboardButton("5", callback_data=f"{flow_type}_num_5"),
-                InlineKeyboardButton("6", callback_data=f"{flow_type}_num_6")
-            ],
-            [
-                InlineKeyboardButton("7", callback_data=f"{flow_type}_num_7"),
-                InlineKeyboardButton("8", callback_data=f"{flow_type}_num_8"),
-                InlineKeyboardButton("9", callback_data=f"{flow_type}_num_9")
-            ],
-            [
-                InlineKeyboardButton("0", callback_data=f"{flow_type}_num_0"),
-                InlineKeyboardButton("⌫", callback_data=f"{flow_type}_backspace"),
-                InlineKeyboardButton("OK", callback_data=f"{flow_type}_confirm")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back", callback_data=f"{flow_type}_back")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        # Format input display
-        display_input = current_input
-        if len(current_input) > 8:
-            display_input = current_input[-8:]
+        reply_markup = _NUMERIC_MARKUPS[flow_type]
         
-        # Add separators for date format
-        if len(display_input) >= 4:
-            formatted = f"{display_input[:4]}-{display_input[4:6]}-{display_input[6:8]}" if len(display_input) >= 6 else f"{display_input[:4]}-{display_input[4:]}"
-        else:
-            formatted = display_input
+        # Show the last 8 digits as YYYY-MM-DD, joining only the parts typed so far
+        display_input = current_input[-8:]
+        formatted = "-".join(part for part in (display_input[:4], display_input[4:6], display_input[6:]) if part)
         
         text = (
             f"🔢 Enter Date of Birth\n\n"
@@ -852,70 +1072,26 @@ class DayMateBot:
             f"Example: 1992-07-15"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup, debounce=True)
 
     async def show_custom_duration_input(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show custom duration input options"""
-        keyboard = [
-            [
-                InlineKeyboardButton("Hours", callback_data="time_custom_hours"),
-                InlineKeyboardButton("Minutes", callback_data="time_custom_minutes")
-            ],
-            [
-                InlineKeyboardButton("Seconds", callback_data="time_custom_seconds"),
-                InlineKeyboardButton("⬅️ Back", callback_data="time_duration")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _CUSTOM_UNIT_MARKUP
         
         text = (
             "⏱️ Custom Duration Input\n\n"
             "Choose the unit for your custom duration:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def show_custom_time_input(self, query, context: ContextTypes.DEFAULT_TYPE, time_type: str):
+    async def show_custom_time_input(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                     time_type: str):
         """Show custom time input interface"""
-        chat_id = query.message.chat_id
-        message_id = query.message.message_id
-        session = self.get_session(chat_id, message_id)
-        
         session['data']['custom_time_type'] = time_type
         session['data']['custom_time_input'] = ""
         
-        keyboard = [
-            [
-                InlineKeyboardButton("1", callback_data="time_custom_num_1"),
-                InlineKeyboardButton("2", callback_data="time_custom_num_2"),
-                InlineKeyboardButton("3", callback_data="time_custom_num_3")
-            ],
-            [
-                InlineKeyboardButton("4", callback_data="time_custom_num_4"),
-                InlineKeyboardButton("5", callback_data="time_custom_num_5"),
-                InlineKeyboardButton("6", callback_data="time_custom_num_6")
-            ],
-            [
-                InlineKeyboardButton("7", callback_data="time_custom_num_7"),
-                InlineKeyboardButton("8", callback_data="time_custom_num_8"),
-                InlineKeyboardButton("9", callback_data="time_custom_num_9")
-            ],
-            [
-                InlineKeyboardButton("0", callback_data="time_custom_num_0"),
-                InlineKeyboardButton("⌫", callback_data="time_custom_num_backspace"),
-                InlineKeyboardButton("OK", callback_data="time_custom_confirm")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back", callback_data="time_dur_custom")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _CUSTOM_TIME_MARKUP
         
         text = (
             f"🔢 Enter {time_type.title()}\n\n"
@@ -923,45 +1099,14 @@ class DayMateBot:
             f"Enter the number of {time_type}:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def update_custom_time_display(self, query, context: ContextTypes.DEFAULT_TYPE, current_input: str):
+    async def update_custom_time_display(self, query, context: ContextTypes.DEFAULT_TYPE, session: Dict[str, Any],
+                                         current_input: str):
         """Update custom time input display"""
-        chat_id = query.message.chat_id
-        message_id = query.message.message_id
-        session = self.get_session(chat_id, message_id)
-        
         time_type = session['data'].get('custom_time_type', 'seconds')
         
-        keyboard = [
-            [
-                InlineKeyboardButton("1", callback_data="time_custom_num_1"),
-                InlineKeyboardButton("2", callback_data="time_custom_num_2"),
-                InlineKeyboardButton("3", callback_data="time_custom_num_3")
-            ],
-            [
-                InlineKeyboardButton("4", callback_data="time_custom_num_4"),
-                InlineKeyboardButton("5", callback_data="time_custom_num_5"),
-                InlineKeyboardButton("6", callback_data="time_custom_num_6")
-            ],
-            [
-                InlineKeyboardButton("7", callback_data="time_custom_num_7"),
-                InlineKeyboardButton("8", callback_data="time_custom_num_8"),
-                InlineKeyboardButton("9", callback_data="time_custom_num_9")
-            ],
-            [
-                InlineKeyboardButton("0", callback_data="time_custom_num_0"),
-                InlineKeyboardButton("⌫", callback_data="time_custom_num_backspace"),
-                InlineKeyboardButton("OK", callback_data="time_custom_confirm")
-            ],
-            [
-                InlineKeyboardButton("⬅️ Back", callback_data="time_dur_custom")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _CUSTOM_TIME_MARKUP
         
         text = (
             f"🔢 Enter {time_type.title()}\n\n"
@@ -969,68 +1114,100 @@ class DayMateBot:
             f"Enter the number of {time_type}:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup, debounce=True)
 
     async def show_time_convert_input(self, query, context: ContextTypes.DEFAULT_TYPE):
         """Show time convert input interface"""
-        keyboard = [
-            [
-                InlineKeyboardButton("Hours", callback_data="time_convert_hours"),
-                InlineKeyboardButton("Minutes", callback_data="time_convert_minutes")
-            ],
-            [
-                InlineKeyboardButton("Seconds", callback_data="time_convert_seconds"),
-                InlineKeyboardButton("⬅️ Back", callback_data="time_calc")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _CONVERT_MARKUP
         
         text = (
             "🔢 H/M/S to Total Seconds\n\n"
             "Choose what you want to convert to total seconds:"
         )
         
-        await query.edit_message_text(
-            text=text,
-            reply_markup=reply_markup
-        )
+        await self._render(query, text, reply_markup)
 
-    async def handle_noop_callback(self, query, context: ContextTypes.DEFAULT_TYPE):
+    async def handle_noop_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle no-op callbacks (like weekday headers)"""
-        await query.answer()
+        # Let clients cache the empty answer so repeat taps never reach the bot
+        await update.callback_query.answer(cache_time=NOOP_CACHE_TIME)
+
+async def _enable_eager_tasks(application: Application):
+    """Run new tasks eagerly until their first suspension (Python 3.12+)"""
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
 
 def main():
     """Main function to run the bot"""
     # Validate configuration
     config_errors = validate_config()
     if config_errors:
-        print("Configuration errors found:")
+        logger.error("Configuration errors found:")
         for error in config_errors:
-            print(f"  - {error}")
-        print("\nPlease fix the configuration before running the bot.")
+            logger.error("  - %s", error)
+        logger.error("Please fix the configuration before running the bot.")
         return
     
+    # Use the libuv-based event loop when it is installed (not available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     # Create bot instance
     bot = DayMateBot()
     
-    # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    # Create application with a pooled HTTP client, concurrent update processing
+    # and outgoing requests held to Telegram's flood limits (30/s per bot)
+    request = HTTPXRequest(
+        connection_pool_size=CONNECTION_POOL_SIZE,
+        pool_timeout=POOL_TIMEOUT,
+        http_version=HTTP_VERSION
+    )
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .request(request)
+        .get_updates_request(HTTPXRequest(http_version=HTTP_VERSION))
+        .concurrent_updates(True)
+        .rate_limiter(AIORateLimiter())
+    )
+    
+    # Handlers that finish without suspending (e.g. no-op answers, unchanged
+    # screens) then skip a trip through the event loop's ready queue
+    if hasattr(asyncio, "eager_task_factory"):
+        builder = builder.post_init(_enable_eager_tasks)
+    application = builder.build()
     
-    # Add handlers
-    application.add_handler(CommandHandler("start", bot.start_command))
-    application.add_handler(CallbackQueryHandler(bot.handle_callback_query))
+    # Add handlers (non-blocking so a slow edit doesn't stall other chats)
+    application.add_handler(CommandHandler("start", bot.start_command, block=False))
     
-    # Add no-op handler for non-functional buttons
-    application.add_handler(CallbackQueryHandler(bot.handle_noop_callback, pattern="^noop$"))
+    # No-op buttons must be matched before the catch-all callback handler
+    application.add_handler(CallbackQueryHandler(bot.handle_noop_callback, pattern=_NOOP_PATTERN, block=False))
+    application.add_handler(CallbackQueryHandler(bot.handle_callback_query, block=False))
+    
+    # Only ask Telegram for the update types this bot handles
+    allowed_updates = [Update.MESSAGE, Update.CALLBACK_QUERY]
     
     # Start the bot
-    print("Starting DayMate bot...")
-    print(f"Default timezone: {DEFAULT_TIMEZONE}")
-    print("Press Ctrl+C to stop")
-    application.run_polling()
+    logger.info("Starting DayMate bot...")
+    logger.info("Default timezone: %s", DEFAULT_TIMEZONE)
+    logger.info("Press Ctrl+C to stop")
+    if WEBHOOK_URL:
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=PORT,
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=allowed_updates
+        )
+    else:
+        application.run_polling(
+            timeout=POLL_TIMEOUT,
+            poll_interval=POLL_INTERVAL,
+            allowed_updates=allowed_updates
+        )
 
 if __name__ == '__main__':
     main()
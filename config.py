@@ -3,8 +3,9 @@
 Configuration file for DayMate Telegram Bot
 """
 
+import functools
 import os
-from zoneinfo import ZoneInfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 # Bot Configuration
 BOT_TOKEN = os.getenv('BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
@@ -15,8 +16,21 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 # Bot Settings
-MAX_SESSION_SIZE = 1000  # Maximum number of sessions to keep in memory
-SESSION_TIMEOUT = 3600   # Session timeout in seconds (1 hour)
+MAX_SESSION_SIZE = 10000  # Maximum number of sessions to keep in memory
+SESSION_TIMEOUT = 1800    # Idle session timeout in seconds (30 minutes)
+REDIS_URL = os.getenv('REDIS_URL', '')  # Optional shared session cache, e.g. redis://localhost:6379/0
+
+# Network Settings
+CONNECTION_POOL_SIZE = int(os.getenv('CONNECTION_POOL_SIZE', '256'))  # Concurrent Bot API requests
+POOL_TIMEOUT = 10.0  # Seconds to wait for a free connection
+HTTP_VERSION = os.getenv('HTTP_VERSION', '2')  # '2' multiplexes requests over one connection
+
+# Update Delivery
+POLL_TIMEOUT = 30     # Long-poll timeout for getUpdates in seconds
+POLL_INTERVAL = 0.5   # Pause between getUpdates calls in seconds
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')  # Set to receive updates via webhook instead of polling
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+PORT = int(os.getenv('PORT', '8000'))
 
 # Supported Timezones
 SUPPORTED_TIMEZONES = [
@@ -46,6 +60,10 @@ TIME_PRESETS = {
     '1 week': 604800
 }
 
+# Preset durations in ascending order, and the label for each
+TIME_PRESETS_SECONDS = tuple(sorted(TIME_PRESETS.values()))
+LABEL_BY_SECONDS = {seconds: label for label, seconds in TIME_PRESETS.items()}
+
 # Calendar Settings
 CALENDAR_MONTHS_AHEAD = 12  # How many months ahead to show in calendar
 CALENDAR_MONTHS_BEHIND = 12  # How many months behind to show in calendar
@@ -55,33 +73,37 @@ MAX_AGE_YEARS = 150  # Maximum age to allow
 MIN_BIRTH_YEAR = 1900  # Minimum birth year to allow
 MAX_FUTURE_DAYS = 365  # Maximum days in future for date calculations
 
+def _timezone_error(name):
+    """Describe why a timezone name cannot be loaded, or None if it can"""
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        return f"Invalid timezone: {name} - {e}"
+    return None
+
+@functools.lru_cache(maxsize=None)
 def get_timezone():
-    """Get the configured timezone"""
+    """Get the configured timezone (resolved once)"""
     try:
         return ZoneInfo(DEFAULT_TIMEZONE)
-    except Exception:
+    except (ZoneInfoNotFoundError, ValueError):
         # Fallback to UTC if timezone is invalid
         return ZoneInfo('UTC')
 
 def validate_config():
     """Validate configuration settings"""
-    errors = []
-    
-    if not BOT_TOKEN or BOT_TOKEN == 'YOUR_BOT_TOKEN_HERE':
-        errors.append("BOT_TOKEN is not set or is using default value")
-    
-    try:
-        get_timezone()
-    except Exception as e:
-        errors.append(f"Invalid timezone: {DEFAULT_TIMEZONE} - {e}")
-    
-    if MAX_SESSION_SIZE <= 0:
-        errors.append("MAX_SESSION_SIZE must be positive")
-    
-    if SESSION_TIMEOUT <= 0:
-        errors.append("SESSION_TIMEOUT must be positive")
+    # get_timezone() falls back to UTC, so check the configured name itself
+    timezone_error = _timezone_error(DEFAULT_TIMEZONE)
     
-    return errors
+    checks = (
+        (not BOT_TOKEN or BOT_TOKEN == 'YOUR_BOT_TOKEN_HERE', "BOT_TOKEN is not set or is using default value"),
+        (timezone_error is not None, timezone_error),
+        (MAX_SESSION_SIZE <= 0, "MAX_SESSION_SIZE must be positive"),
+        (SESSION_TIMEOUT <= 0, "SESSION_TIMEOUT must be positive"),
+        (CONNECTION_POOL_SIZE <= 0, "CONNECTION_POOL_SIZE must be positive"),
+        (HTTP_VERSION not in ('1.1', '2', '2.0'), f"Invalid HTTP_VERSION: {HTTP_VERSION} (use 1.1 or 2)"),
+    )
+    return [message for failed, message in checks if failed]
 
 if __name__ == '__main__':
     # Validate configuration when run directly
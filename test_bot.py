@@ -4,13 +4,19 @@ Unit tests for DayMate Telegram Bot
 Tests core date/time calculation functionality
 """
 
+import asyncio
+import json
 import unittest
+from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, date, timedelta
 from zoneinfo import ZoneInfo
 from dateutil.relativedelta import relativedelta
+from telegram import InlineKeyboardMarkup
+from telegram.error import TimedOut
 
 # Import the bot class (assuming it's in the same directory)
-from bot import DayMateBot
+from bot import DayMateBot, sessions, _calendar_markup, _days_in_month, _parse_yyyymmdd, _ymd_diff, _PRESETS_MARKUP
+from config import TIME_PRESETS, TIME_PRESETS_SECONDS
 
 class TestDayMateBot(unittest.TestCase):
     """Test cases for DayMate bot functionality"""
@@ -53,18 +59,6 @@ class TestDayMateBot(unittest.TestCase):
         self.assertEqual(diff.days, 7)
         self.assertEqual(total_days, 615)
     
-    def test_time_duration_formatting(self):
-        """Test time duration formatting"""
-        # Test case 1: 90 minutes = 5400 seconds
-        total_seconds = 5400
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        
-        self.assertEqual(hours, 1)
-        self.assertEqual(minutes, 30)
-        self.assertEqual(seconds, 0)
-    
     def test_leap_year_handling(self):
         """Test leap year handling in age calculation"""
         # Test case: Person born on Feb 29, 2000 (leap year)
@@ -115,7 +109,7 @@ class TestDayMateBot(unittest.TestCase):
         test_callback = "age_date_20250908"
         self.assertLessEqual(len(test_callback), 64)
         
-        test_callback = "days_prev_2025_9"
+        test_callback = "days_nav_202509"
         self.assertLessEqual(len(test_callback), 64)
         
         test_callback = "time_custom_num_123456789"
@@ -128,7 +122,7 @@ class TestDayMateBot(unittest.TestCase):
         self.assertEqual(len(valid_date), 8)
         
         try:
-            parsed_date = datetime.strptime(valid_date, "%Y%m%d").date()
+            parsed_date = _parse_yyyymmdd(valid_date)
             self.assertIsInstance(parsed_date, date)
         except ValueError:
             self.fail("Valid date format should not raise ValueError")
@@ -136,30 +130,8 @@ class TestDayMateBot(unittest.TestCase):
         # Test invalid date format
         invalid_date = "1992071"  # Too short
         self.assertNotEqual(len(invalid_date), 8)
-    
-    def test_duration_calculations(self):
-        """Test various duration calculations"""
-        # Test 1 hour
-        one_hour = 3600
-        hours = one_hour // 3600
-        minutes = (one_hour % 3600) // 60
-        seconds = one_hour % 60
-        
-        self.assertEqual(hours, 1)
-        self.assertEqual(minutes, 0)
-        self.assertEqual(seconds, 0)
-        
-        # Test 1 day
-        one_day = 86400
-        hours = one_day // 3600
-        self.assertEqual(hours, 24)
-        
-        # Test 90 minutes
-        ninety_minutes = 5400
-        hours = ninety_minutes // 3600
-        minutes = (ninety_minutes % 3600) // 60
-        self.assertEqual(hours, 1)
-        self.assertEqual(minutes, 30)
+        with self.assertRaises(ValueError):
+            _parse_yyyymmdd(invalid_date)
     
     def test_edge_cases(self):
         """Test edge cases in date calculations"""
@@ -181,27 +153,390 @@ class TestDayMateBot(unittest.TestCase):
 class TestBotUtilities(unittest.TestCase):
     """Test utility functions"""
     
+    def test_today_cached(self):
+        """Test today's date is cached until the next local midnight"""
+        bot = DayMateBot()
+        today = bot._today(bot.timezone)
+        self.assertEqual(today, datetime.now(bot.timezone).date())
+        expires, cached = bot._today_cache[bot.timezone]
+        self.assertEqual(cached, today)
+        midnight = datetime.fromtimestamp(expires, bot.timezone)
+        self.assertEqual(midnight.date(), today + timedelta(days=1))
+        self.assertEqual((midnight.hour, midnight.minute), (0, 0))
+    
     def test_format_duration(self):
         """Test duration formatting function"""
         bot = DayMateBot()
+        cases = (
+            (0, "0 hours, 0 minutes, 0 seconds"),
+            (3600, "1 hour, 0 minutes, 0 seconds"),
+            (3661, "1 hour, 1 minute, 1 second"),
+            (5400, "1 hour, 30 minutes, 0 seconds"),
+            (86400, "24 hours, 0 minutes, 0 seconds"),
+        )
+        for seconds, expected in cases:
+            with self.subTest(seconds=seconds):
+                self.assertEqual(bot.format_duration(seconds), expected)
+    
+    def test_presets_markup_from_config(self):
+        """Test the presets keyboard lists every configured preset by duration"""
+        buttons = [button for row in _PRESETS_MARKUP.inline_keyboard[:-1] for button in row]
+        self.assertEqual(
+            [button.callback_data for button in buttons],
+            [f"time_preset_{seconds}" for seconds in TIME_PRESETS_SECONDS]
+        )
+        for button in buttons:
+            self.assertEqual(TIME_PRESETS[button.text], int(button.callback_data.rsplit("_", 1)[1]))
+    
+    def test_calendar_markup_cached(self):
+        """Test calendar keyboards are built once per month and flow"""
+        markup = _calendar_markup(2025, 9, "age", "")
+        self.assertIs(markup, _calendar_markup(2025, 9, "age", ""))
+        self.assertIsNot(markup, _calendar_markup(2025, 9, "days", ""))
+        
+        # Calendars carrying a start date are built on demand, not pinned
+        end_markup = _calendar_markup(2025, 9, "days", "20250901")
+        self.assertIsNot(end_markup, _calendar_markup(2025, 9, "days", "20250901"))
+        self.assertEqual(end_markup.inline_keyboard[-1][0].callback_data, "days_today_20250901")
+        
+        # September 2025 starts on a Monday
+        day_row = markup.inline_keyboard[2]
+        self.assertEqual(day_row[0].callback_data, "age_date_20250901")
+        
+        # Navigation buttons carry the target month, wrapping years
+        nav_row = _calendar_markup(2025, 1, "days", "").inline_keyboard[0]
+        self.assertEqual(nav_row[0].callback_data, "days_nav_202412")
+        self.assertEqual(nav_row[2].callback_data, "days_nav_202502")
+        
+        # No navigation past the first and last supported months
+        self.assertEqual(_calendar_markup(1, 1, "age", "").inline_keyboard[0][0].callback_data, "noop")
+        self.assertEqual(_calendar_markup(9999, 12, "age", "").inline_keyboard[0][2].callback_data, "noop")
+
+    def test_static_markup_payload(self):
+        """Test static keyboards serialize once, to the same payload"""
+        markup = _calendar_markup(2025, 9, "age", "")
+        plain = InlineKeyboardMarkup(markup.inline_keyboard)
+        self.assertEqual(markup.to_dict(), plain.to_dict())
+        self.assertIs(markup.to_dict(), markup.to_dict())
+        self.assertEqual(markup.to_json(), plain.to_json())
+    
+    def test_days_in_month(self):
+        """Test month lengths including leap years"""
+        self.assertEqual(_days_in_month(2025, 1), 31)
+        self.assertEqual(_days_in_month(2025, 4), 30)
+        self.assertEqual(_days_in_month(2024, 2), 29)
+        self.assertEqual(_days_in_month(2023, 2), 28)
+        self.assertEqual(_days_in_month(1900, 2), 28)
+        self.assertEqual(_days_in_month(2000, 2), 29)
+    
+    def test_ymd_diff(self):
+        """Test the year/month/day difference matches relativedelta"""
+        cases = [
+            (date(1992, 7, 15), date(2025, 9, 8)),
+            (date(2024, 1, 31), date(2024, 3, 1)),
+            (date(2023, 1, 31), date(2023, 3, 1)),
+            (date(2020, 2, 29), date(2021, 2, 28)),
+            (date(2020, 2, 29), date(2024, 2, 29)),
+            (date(2024, 5, 31), date(2024, 6, 30)),
+            (date(2024, 12, 15), date(2025, 1, 14)),
+            (date(2025, 9, 8), date(2025, 9, 8)),
+        ]
+        for start, end in cases:
+            diff = relativedelta(end, start)
+            self.assertEqual(_ymd_diff(end, start), (diff.years, diff.months, diff.days))
+    
+    def test_parse_yyyymmdd(self):
+        """Test compact date parsing used by callbacks"""
+        self.assertEqual(_parse_yyyymmdd("19920715"), date(1992, 7, 15))
+        self.assertEqual(_parse_yyyymmdd("20240229"), date(2024, 2, 29))
         
-        # Test 1 hour
-        result = bot.format_duration(3600)
-        self.assertIn("1 hours", result)
-        self.assertIn("0 minutes", result)
-        self.assertIn("0 seconds", result)
-        
-        # Test 90 minutes
-        result = bot.format_duration(5400)
-        self.assertIn("1 hours", result)
-        self.assertIn("30 minutes", result)
-        self.assertIn("0 seconds", result)
-        
-        # Test 1 day
-        result = bot.format_duration(86400)
-        self.assertIn("24 hours", result)
-        self.assertIn("0 minutes", result)
-        self.assertIn("0 seconds", result)
+        with self.assertRaises(ValueError):
+            _parse_yyyymmdd("20230229")  # Not a leap year
+        with self.assertRaises(ValueError):
+            _parse_yyyymmdd("19921315")  # Invalid month
+        for malformed in ("2024011", "202401011", "+2024011", "2024 101", "２０２４０１０１"):
+            with self.assertRaises(ValueError):
+                _parse_yyyymmdd(malformed)
+
+class TestCallbackRouting(unittest.IsolatedAsyncioTestCase):
+    """Test callback query dispatch"""
+    
+    def setUp(self):
+        self.bot = DayMateBot()
+        sessions.clear()
+    
+    def make_update(self, data, message_id=1):
+        """Build a fake callback query update"""
+        query = MagicMock()
+        query.data = data
+        query.message.chat_id = 42
+        query.message.message_id = message_id
+        query.answer = AsyncMock()
+        query.edit_message_text = AsyncMock()
+        update = MagicMock()
+        update.callback_query = query
+        return update, query
+    
+    async def test_exact_route(self):
+        """Test exact callback data opens the matching screen"""
+        update, query = self.make_update("help")
+        await self.bot.handle_callback_query(update, None)
+        text = query.edit_message_text.call_args.kwargs["text"]
+        self.assertTrue(text.startswith("❓ Help"))
+        query.answer.assert_awaited_once()
+    
+    async def test_exact_flow_screens(self):
+        """Test argument-free flow buttons open their screens"""
+        expected = {
+            "age_calendar": "📅 Select Date of Birth",
+            "age_back": "🎂 Age Calculator",
+            "days_start": "📅 Select Start Date",
+            "time_duration": "⏱️ Duration",
+            "time_presets": "⚡",
+        }
+        for data, prefix in expected.items():
+            update, query = self.make_update(data)
+            await self.bot.handle_callback_query(update, None)
+            self.assertTrue(query.edit_message_text.call_args.kwargs["text"].startswith(prefix), data)
+    
+    async def test_prefix_route(self):
+        """Test flow prefixes are routed to the flow handler"""
+        update, query = self.make_update("age_date_19920715")
+        await self.bot.handle_callback_query(update, None)
+        text = query.edit_message_text.call_args.kwargs["text"]
+        self.assertIn("1992-07-15", text)
+    
+    async def test_calendar_navigation(self):
+        """Test calendar navigation renders the target month"""
+        update, query = self.make_update("age_nav_202412")
+        await self.bot.handle_callback_query(update, None)
+        kwargs = query.edit_message_text.call_args.kwargs
+        self.assertIn("December 2024", kwargs["text"])
+        self.assertIs(kwargs["reply_markup"], _calendar_markup(2024, 12, "age", ""))
+    
+    async def test_malformed_navigation_ignored(self):
+        """Test navigation to an impossible month is only acknowledged"""
+        for data in ("age_nav_202413", "age_nav_2024", "age_nav_000012", "days_nav_202401_2024"):
+            update, query = self.make_update(data)
+            await self.bot.handle_callback_query(update, None)
+            query.edit_message_text.assert_not_called()
+            query.answer.assert_awaited_once_with()
+    
+    async def test_days_flow_carries_start_date(self):
+        """Test the days flow keeps the start date in callback data"""
+        update, query = self.make_update("days_date_20240101")
+        await self.bot.handle_callback_query(update, None)
+        kwargs = query.edit_message_text.call_args.kwargs
+        self.assertIn("Select End Date", kwargs["text"])
+        day_row = kwargs["reply_markup"].inline_keyboard[2]
+        self.assertTrue(day_row[-1].callback_data.endswith("_20240101"))
+        
+        # A fresh message (no session) can finish the calculation
+        update, query = self.make_update("days_date_20250908_20240101", message_id=2)
+        await self.bot.handle_callback_query(update, None)
+        kwargs = query.edit_message_text.call_args.kwargs
+        self.assertIn("From 2024-01-01 to 2025-09-08", kwargs["text"])
+        swap_button = kwargs["reply_markup"].inline_keyboard[0][0]
+        self.assertEqual(swap_button.callback_data, "days_swap_20240101_20250908")
+    
+    async def test_unchanged_screen_not_edited(self):
+        """Test re-rendering the same screen skips the edit"""
+        update, query = self.make_update("help")
+        await self.bot.handle_callback_query(update, None)
+        await self.bot.handle_callback_query(update, None)
+        self.assertEqual(query.edit_message_text.await_count, 1)
+        self.assertEqual(query.answer.await_count, 2)
+    
+    async def test_error_alert(self):
+        """Test error paths answer with a single alert"""
+        update, query = self.make_update("age_date_29990101")
+        await self.bot.handle_callback_query(update, None)
+        query.answer.assert_awaited_once_with("Date of birth cannot be in the future!", show_alert=True)
+        query.edit_message_text.assert_not_called()
+    
+    async def test_notice_replaces_ack(self):
+        """Test a toast notice is sent instead of the plain acknowledgement"""
+        update, query = self.make_update("settings_tz_UTC")
+        await self.bot.handle_callback_query(update, None)
+        query.answer.assert_awaited_once_with("Timezone changed to UTC")
+        query.edit_message_text.assert_awaited_once()
+    
+    async def test_keypad_backspace(self):
+        """Test the keypad backspace button removes the last digit"""
+        update, query = self.make_update("age_num_1")
+        await self.bot.handle_callback_query(update, None)
+        keypad = query.edit_message_text.call_args.kwargs["reply_markup"]
+        query.data = keypad.inline_keyboard[3][1].callback_data
+        await self.bot.handle_callback_query(update, None)
+        self.assertEqual(self.bot.get_session(42, 1)['data']['numeric_input'], "")
+    
+    async def test_failed_edit_not_skipped(self):
+        """Test a screen whose edit failed is sent again on the next tap"""
+        update, query = self.make_update("help")
+        query.edit_message_text = AsyncMock(side_effect=TimedOut())
+        with self.assertRaises(TimedOut):
+            await self.bot.handle_callback_query(update, None)
+        
+        query.edit_message_text = AsyncMock()
+        await self.bot.handle_callback_query(update, None)
+        query.edit_message_text.assert_awaited_once()
+    
+    async def test_edits_coalesced(self):
+        """Test screens queued behind an in-flight edit collapse to the latest"""
+        release = asyncio.Event()
+        
+        async def slow_edit(**kwargs):
+            await release.wait()
+        
+        update, query = self.make_update("help")
+        query.edit_message_text = AsyncMock(side_effect=slow_edit)
+        first = asyncio.create_task(self.bot.handle_callback_query(update, None))
+        await asyncio.sleep(0)
+        for data in ("settings", "age_calc", "days_calc"):
+            query.data = data
+            await self.bot.handle_callback_query(update, None)
+        release.set()
+        await first
+        
+        self.assertEqual(query.edit_message_text.await_count, 2)
+        self.assertTrue(query.edit_message_text.call_args.kwargs["text"].startswith("📅 Days Calculator"))
+    
+    async def test_keypad_debounced(self):
+        """Test fast keypad taps are drawn with a single edit"""
+        updates = [self.make_update(f"age_num_{digit}")[0] for digit in "123"]
+        await asyncio.gather(*(self.bot.handle_callback_query(update, None) for update in updates))
+        
+        edits = [update.callback_query.edit_message_text for update in updates]
+        self.assertEqual(sum(edit.await_count for edit in edits), 1)
+        self.assertIn("Current input: 123", edits[-1].call_args.kwargs["text"])
+        for update in updates:
+            update.callback_query.answer.assert_awaited_once_with()
+    
+    async def test_timezone_per_session(self):
+        """Test a timezone change only affects its own menu message"""
+        update, query = self.make_update("settings_tz_Asia/Tokyo")
+        await self.bot.handle_callback_query(update, None)
+        self.assertIn("Current timezone: Asia/Tokyo", query.edit_message_text.call_args.kwargs["text"])
+        self.assertEqual(self.bot.get_session(42, 1)['timezone'], ZoneInfo("Asia/Tokyo"))
+        self.assertEqual(self.bot.get_session(42, 2)['timezone'], self.bot.timezone)
+    
+    async def test_unsupported_timezone(self):
+        """Test timezones outside the supported list are rejected"""
+        update, query = self.make_update("settings_tz_Mars/Olympus")
+        await self.bot.handle_callback_query(update, None)
+        query.answer.assert_awaited_once_with("Invalid timezone: Mars/Olympus", show_alert=True)
+        query.edit_message_text.assert_not_called()
+    
+    @unittest.skipUnless(hasattr(asyncio, "eager_task_factory"), "requires Python 3.12+")
+    async def test_alert_with_eager_tasks(self):
+        """Test alerts still replace the acknowledgement under eager tasks"""
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        update, query = self.make_update("age_date_29990101")
+        await self.bot.handle_callback_query(update, None)
+        query.answer.assert_awaited_once_with("Date of birth cannot be in the future!", show_alert=True)
+    
+    async def test_noop_callback(self):
+        """Test no-op buttons get a cacheable empty answer"""
+        update, query = self.make_update("noop")
+        await self.bot.handle_noop_callback(update, None)
+        query.answer.assert_awaited_once_with(cache_time=3600)
+    
+    async def test_shared_session_cache(self):
+        """Test sessions round-trip through the shared cache"""
+        store = {}
+        cache = MagicMock()
+        cache.get = AsyncMock(side_effect=lambda key: store.get(key))
+        cache.set = AsyncMock(side_effect=lambda key, value, ex: store.__setitem__(key, value))
+        self.bot.cache = cache
+        
+        update, query = self.make_update("age_num_1")
+        await self.bot.handle_callback_query(update, None)
+        self.assertEqual(len(store), 1)
+        self.assertNotIn('last_render', json.loads(next(iter(store.values()))))
+        
+        # Another worker (empty local copy) continues from the cached state
+        sessions.clear()
+        update, query = self.make_update("age_num_9")
+        await self.bot.handle_callback_query(update, None)
+        session = self.bot.get_session(42, 1)
+        self.assertEqual(session['data']['numeric_input'], "19")
+        self.assertEqual(session['timezone'], self.bot.timezone)
+    
+    async def test_cached_session_keeps_concurrent_taps(self):
+        """Test keypad taps handled concurrently with a shared cache keep every digit"""
+        store = {}
+        
+        async def get(key):
+            await asyncio.sleep(0.01)
+            return store.get(key)
+        
+        async def set(key, value, ex):
+            await asyncio.sleep(0.01)
+            store[key] = value
+        
+        cache = MagicMock()
+        cache.get = AsyncMock(side_effect=get)
+        cache.set = AsyncMock(side_effect=set)
+        self.bot.cache = cache
+        
+        update, query = self.make_update("age_numeric")
+        await self.bot.handle_callback_query(update, None)
+        taps = []
+        for digit in "123":
+            update, query = self.make_update(f"age_num_{digit}")
+            taps.append(asyncio.create_task(self.bot.handle_callback_query(update, None)))
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*taps)
+        self.assertEqual(self.bot.get_session(42, 1)['data']['numeric_input'], "123")
+        
+        # The cached copy has every digit too
+        sessions.clear()
+        session = await self.bot.load_session(42, 1)
+        self.assertEqual(session['data']['numeric_input'], "123")
+    
+    async def test_time_buttons(self):
+        """Test every duration and preset button shows its result"""
+        update, query = self.make_update("time_duration")
+        await self.bot.handle_callback_query(update, None)
+        rows = query.edit_message_text.call_args.kwargs["reply_markup"].inline_keyboard + _PRESETS_MARKUP.inline_keyboard
+        for data in (button.callback_data for row in rows for button in row):
+            if not data[-1].isdigit():
+                continue
+            with self.subTest(data=data):
+                update, query = self.make_update(data)
+                await self.bot.handle_callback_query(update, None)
+                self.assertTrue(query.edit_message_text.call_args.kwargs["text"].startswith("🕰 Convert"))
+    
+    async def test_malformed_time_args_ignored(self):
+        """Test duration arguments no button carries are only acknowledged"""
+        for data in ("time_preset_²", "time_dur_٣٦٠٠", "time_dur_99999999999999999999", "time_preset_61"):
+            with self.subTest(data=data):
+                update, query = self.make_update(data)
+                await self.bot.handle_callback_query(update, None)
+                query.edit_message_text.assert_not_called()
+                query.answer.assert_awaited_once_with()
+    
+    async def test_failed_session_load_released(self):
+        """Test a cache read that fails or is cancelled does not leave its callback counted"""
+        local = self.bot.get_session(42, 1)
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value='{"timezone": "Mars/Olympus"')
+        self.bot.cache = cache
+        with self.assertRaises(ValueError):
+            await self.bot.load_session(42, 1)
+        self.assertIs(self.bot.get_session(42, 1), local)
+        
+        cache.get = AsyncMock(side_effect=asyncio.CancelledError)
+        with self.assertRaises(asyncio.CancelledError):
+            await self.bot.load_session(42, 1)
+        self.assertEqual(self.bot._session_users, {})
+    
+    async def test_unknown_route(self):
+        """Test unknown callback data is ignored"""
+        update, query = self.make_update("share_age_1992-07-15")
+        await self.bot.handle_callback_query(update, None)
+        query.edit_message_text.assert_not_called()
+        query.answer.assert_awaited_once_with()
 
 def run_tests():
     """Run all tests"""
@@ -209,8 +544,10 @@ def run_tests():
     test_suite = unittest.TestSuite()
     
     # Add test cases
-    test_suite.addTest(unittest.makeSuite(TestDayMateBot))
-    test_suite.addTest(unittest.makeSuite(TestBotUtilities))
+    loader = unittest.defaultTestLoader
+    test_suite.addTests(loader.loadTestsFromTestCase(TestDayMateBot))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBotUtilities))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCallbackRouting))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)